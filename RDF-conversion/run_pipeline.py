@@ -9,13 +9,18 @@ Usage:
     python run_pipeline.py --step 2          # Run specific step
     python run_pipeline.py --from 3           # Run from step 3 onwards
     python run_pipeline.py --artifacts <path> # Specify artifacts directory
+    python run_pipeline.py --force            # Re-run steps even if up to date
 """
 
 import argparse
+import hashlib
+import inspect
 import os
 import sys
 from pathlib import Path
 
+import orjson
+
 # ============================================================================
 # CONFIGURATION - EDIT THIS FOR EACH RUN
 # ============================================================================
@@ -33,7 +38,14 @@ DEFAULT_ARTIFACTS = "../path/to/artifacts"
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+import config
+from config import (
+    PIPELINE_DIR, ENTITIES_PARQUET, RELATIONSHIPS_PARQUET, OUTPUT_DIR,
+    EXTRACTED_DATA, REFINED_DATA, MAPPED_DATA, FINAL_RDF,
+    DBO_CLASSES_CACHE, DBO_PROPERTIES_CACHE
+)
 from steps import step1_extract, step2_refine_llm, step3_map_dbo, step4_convert_rdf
+from steps.step1_extract import ENTITIES_TABLE, RELATIONSHIPS_TABLE
 from validate_output import validate
 
 # All pipeline steps defined once
@@ -44,21 +56,114 @@ STEPS = [
     (4, "Convert to RDF", step4_convert_rdf.run),
 ]
 
-
-def run_steps(from_step: int = 1, to_step: int = 4):
-    """Run pipeline steps in range [from_step, to_step]."""
+# Data files each step reads and writes (its own source and config.py are
+# added as inputs too), used to skip steps whose inputs have not changed
+STEP_FILES = {
+    1: ([PIPELINE_DIR / ENTITIES_PARQUET, PIPELINE_DIR / RELATIONSHIPS_PARQUET],
+        [EXTRACTED_DATA, ENTITIES_TABLE, RELATIONSHIPS_TABLE]),
+    2: ([EXTRACTED_DATA, Path(step2_refine_llm.__file__).with_name("prompts.py")],
+        [REFINED_DATA]),
+    3: ([REFINED_DATA, DBO_CLASSES_CACHE, DBO_PROPERTIES_CACHE], [MAPPED_DATA]),
+    4: ([MAPPED_DATA, ENTITIES_TABLE, RELATIONSHIPS_TABLE], [FINAL_RDF]),
+}
+
+# Files the pipeline writes itself are signed by content, not mtime: a step
+# that rewrites one with the same bytes (e.g. heuristic step 2 re-running
+# while Ollama is down) must not make the steps after it run again
+CONTENT_SIGNED = {
+    path.resolve() for path in (
+        EXTRACTED_DATA, ENTITIES_TABLE, RELATIONSHIPS_TABLE, REFINED_DATA,
+        MAPPED_DATA, DBO_CLASSES_CACHE, DBO_PROPERTIES_CACHE
+    )
+}
+
+STATE_FILE = OUTPUT_DIR / "pipeline_state.json"
+
+
+def file_digest(path: Path) -> str:
+    """sha1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def input_signature(num: int, func) -> list:
+    """
+    Resolved path plus content hash (pipeline outputs) or mtime and size
+    (source data, code, config) of every input of a step.
+    """
+    inputs, _ = STEP_FILES[num]
+    inputs = inputs + [Path(inspect.getsourcefile(func)), Path(config.__file__)]
+    signature = []
+    for path in inputs:
+        path = path.resolve()
+        if not path.exists():
+            signature.append([str(path), None])
+        elif path in CONTENT_SIGNED:
+            signature.append([str(path), file_digest(path)])
+        else:
+            stat = path.stat()
+            signature.append([str(path), stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        with open(STATE_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    return {}
+
+
+def save_state(state: dict):
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(STATE_FILE, 'wb') as f:
+        f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+
+
+def run_steps(from_step: int = 1, to_step: int = 4, force: bool = False):
+    """
+    Run pipeline steps in range [from_step, to_step].
+
+    A step is skipped when its outputs exist and its inputs (data files,
+    step source, config) are unchanged since it last ran, unless force.
+    """
     print("\n" + "=" * 70)
     print("  RDF PIPELINE - GraphRAG to DBpedia RDF")
     print("=" * 70)
 
+    state = load_state()
+
+    # Each step's result is handed straight to the next one; a step only
+    # reads its predecessor's output file when that did not run here.
+    result = None
+
     for num, name, func in STEPS:
         if from_step <= num <= to_step:
             print(f"\n{'─' * 70}")
-            result = func()
+            signature = input_signature(num, func)
+            outputs = STEP_FILES[num][1]
+            if (not force and state.get(str(num)) == signature
+                    and all(path.exists() for path in outputs)):
+                print(f"Step {num}: {name} - skipped (up-to-date)")
+                result = None
+                continue
+
+            result = func() if result is None else func(result)
             if result is None:
                 print(f"\nERROR: Step {num} failed. Aborting.")
                 return False
 
+            if num == 2 and not result.get("used_llm"):
+                # Heuristic fallback (Ollama was down): run step 2 again
+                # next time instead of keeping these refinements
+                state.pop(str(num), None)
+            else:
+                # Re-read: step 3 may have just written the ontology caches
+                state[str(num)] = input_signature(num, func)
+            save_state(state)
+
     # Auto-validate at end if we completed step 4
     if to_step >= 4:
         print(f"\n{'─' * 70}")
@@ -89,6 +194,10 @@ def main():
         "--artifacts", "-a", type=str,
         help="Path to GraphRAG artifacts directory (overrides DEFAULT_ARTIFACTS)"
     )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Re-run steps even if their outputs are up to date"
+    )
 
     args = parser.parse_args()
     
@@ -121,11 +230,11 @@ def main():
         print(f"Using artifacts directory: {artifacts_path}")
 
     if args.step:
-        success = run_steps(args.step, args.step)
+        success = run_steps(args.step, args.step, args.force)
     elif args.from_step:
-        success = run_steps(args.from_step, 4)
+        success = run_steps(args.from_step, 4, args.force)
     else:
-        success = run_steps(1, 4)
+        success = run_steps(1, 4, args.force)
 
     return 0 if success else 1
 
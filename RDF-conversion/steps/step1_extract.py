@@ -6,34 +6,74 @@ Reads the GraphRAG parquet output and extracts:
 - All unique entity types
 - All unique relationship descriptions (which become predicates)
 
-Output: step1_extracted.json
+Output: step1_extracted.json (types, predicates),
+        step1_entities.feather, step1_relationships.feather
 """
 
 from config import (
     ENTITIES_PARQUET, RELATIONSHIPS_PARQUET,
     EXTRACTED_DATA, OUTPUT_DIR, PIPELINE_DIR
 )
-import json
-import re
 import sys
 from pathlib import Path
 
-import pandas as pd
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
-def clean_string(s: str) -> str:
-    """Clean GraphRAG string (remove quotes, LLM artifacts)."""
-    if pd.isna(s) or not s:
-        return ""
-    s = str(s).strip()
-    if s.startswith('"') and s.endswith('"'):
-        s = s[1:-1]
-    s = re.sub(r'<\|[A-Z]+\|>', '', s)
-    s = re.sub(r'\)\s*\("entity".*$', '', s)
-    return s.strip()
+PARQUET_BATCH_ROWS = 65536
+
+# Entity/relationship rows are read back by step 4 only, as Arrow tables
+ENTITIES_TABLE = OUTPUT_DIR / "step1_entities.feather"
+RELATIONSHIPS_TABLE = OUTPUT_DIR / "step1_relationships.feather"
+
+# GraphRAG LLM artifacts: "<|COMPLETE|>"-style tokens and spilled-over
+# ') ("entity"...' tails, removed in a single regex pass.
+_ARTIFACT_PATTERN = r'<\|[A-Z]+\|>|\)\s*\("entity".*$'
+
+# A value wrapped in double quotes (or a lone quote): keep what is inside
+_QUOTED_PATTERN = r'^"$|^"((?s:.*))"$'
+
+
+def clean_array(arr: pa.Array) -> pa.Array:
+    """Clean a GraphRAG string column (remove quotes, LLM artifacts)."""
+    arr = pc.fill_null(pc.cast(arr, pa.string()), "")
+    arr = pc.utf8_trim_whitespace(arr)
+    arr = pc.replace_substring_regex(arr, pattern=_QUOTED_PATTERN, replacement=r"\1")
+    arr = pc.replace_substring_regex(arr, pattern=_ARTIFACT_PATTERN, replacement="")
+    return pc.utf8_trim_whitespace(arr)
+
+
+def read_columns(path: Path, columns: dict[str, str], raw=()) -> pa.Table:
+    """
+    Stream selected parquet columns batch by batch and clean them.
+
+    columns maps parquet column -> output column. Columns listed in raw are
+    copied as-is; all others go through clean_array, and missing ones are
+    filled with empty strings. Only these columns are read, and each record
+    batch is cleaned before the next is decoded.
+    """
+    parquet = pq.ParquetFile(path)
+    present = [c for c in columns if c in parquet.schema_arrow.names]
+
+    batches = []
+    for batch in parquet.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=present):
+        empty = pa.nulls(batch.num_rows, pa.string())
+        batches.append(pa.RecordBatch.from_pydict({
+            out: batch.column(col) if col in raw
+            else clean_array(batch.column(col) if col in present else empty)
+            for col, out in columns.items()
+        }))
+
+    if not batches:
+        return pa.table({out: pa.array([], pa.string()) for out in columns.values()})
+    return pa.Table.from_batches(batches)
 
 
 def extract_types_and_predicates(
@@ -47,8 +87,8 @@ def extract_types_and_predicates(
         Dictionary with:
         - types: {type_name: {count, example_entities}}
         - predicates: {description: {count, example_source, example_target}}
-        - entities: [{id, name, type}]
-        - relationships: [{source, target, description}]
+        - entities: Arrow table (id, name, original_type)
+        - relationships: Arrow table (source, target, original_description)
     """
     print("Step 1: Extracting types and predicates from parquet files")
     print("=" * 60)
@@ -57,65 +97,50 @@ def extract_types_and_predicates(
     # Extract entities and types
     # -------------------------------------------------------------------------
     print(f"\nReading entities from: {entities_path}")
-    entities_df = pd.read_parquet(entities_path)
-
-    entities = []
-    types = {}
-
-    for _, row in entities_df.iterrows():
-        entity_id = row['id']
-        name = clean_string(row['name'])
-        entity_type = clean_string(row.get('type', ''))
-
-        entities.append({
-            "id": entity_id,
-            "name": name,
-            "original_type": entity_type
-        })
-
-        if entity_type:
-            if entity_type not in types:
-                types[entity_type] = {
-                    "count": 0,
-                    "example_entities": []
-                }
-            types[entity_type]["count"] += 1
-            if len(types[entity_type]["example_entities"]) < 3:
-                types[entity_type]["example_entities"].append(name)
-
-    print(f"  Found {len(entities)} entities")
+    entities_table = read_columns(
+        entities_path,
+        {"id": "id", "name": "name", "type": "original_type"},
+        raw=("id",)
+    )
+
+    typed = entities_table.filter(pc.not_equal(entities_table["original_type"], ""))
+    by_type = typed.group_by("original_type", use_threads=False).aggregate(
+        [("name", "count"), ("name", "list")])
+    examples = pc.list_slice(by_type["name_list"], 0, 3)
+    types = {
+        entity_type: {"count": count, "example_entities": example_entities}
+        for entity_type, count, example_entities in zip(
+            by_type["original_type"].to_pylist(),
+            by_type["name_count"].to_pylist(),
+            examples.to_pylist())
+    }
+
+    print(f"  Found {entities_table.num_rows} entities")
     print(f"  Found {len(types)} unique types")
 
     # -------------------------------------------------------------------------
     # Extract relationships and predicates
     # -------------------------------------------------------------------------
     print(f"\nReading relationships from: {relationships_path}")
-    rels_df = pd.read_parquet(relationships_path)
-
-    relationships = []
-    predicates = {}
-
-    for _, row in rels_df.iterrows():
-        source = clean_string(row['source'])
-        target = clean_string(row['target'])
-        description = clean_string(row.get('description', ''))
-
-        relationships.append({
-            "source": source,
-            "target": target,
-            "original_description": description
-        })
-
-        if description:
-            if description not in predicates:
-                predicates[description] = {
-                    "count": 0,
-                    "example_source": source,
-                    "example_target": target
-                }
-            predicates[description]["count"] += 1
-
-    print(f"  Found {len(relationships)} relationships")
+    rels_table = read_columns(
+        relationships_path,
+        {"source": "source", "target": "target",
+         "description": "original_description"}
+    )
+
+    described = rels_table.filter(pc.not_equal(rels_table["original_description"], ""))
+    by_desc = described.group_by("original_description", use_threads=False).aggregate(
+        [("source", "count"), ("source", "first"), ("target", "first")])
+    predicates = {
+        desc: {"count": count, "example_source": source, "example_target": target}
+        for desc, count, source, target in zip(
+            by_desc["original_description"].to_pylist(),
+            by_desc["source_count"].to_pylist(),
+            by_desc["source_first"].to_pylist(),
+            by_desc["target_first"].to_pylist())
+    }
+
+    print(f"  Found {rels_table.num_rows} relationships")
     print(f"  Found {len(predicates)} unique predicates/descriptions")
 
     # -------------------------------------------------------------------------
@@ -138,8 +163,8 @@ def extract_types_and_predicates(
     return {
         "types": types,
         "predicates": predicates,
-        "entities": entities,
-        "relationships": relationships
+        "entities": entities_table,
+        "relationships": rels_table
     }
 
 
@@ -161,10 +186,14 @@ def run():
 
     # Save output
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(EXTRACTED_DATA, 'w') as f:
-        json.dump(data, f, indent=2)
+    feather.write_feather(data["entities"], ENTITIES_TABLE, compression="zstd")
+    feather.write_feather(data["relationships"], RELATIONSHIPS_TABLE, compression="zstd")
+    with open(EXTRACTED_DATA, 'wb') as f:
+        f.write(orjson.dumps({"types": data["types"], "predicates": data["predicates"]}))
 
     print(f"\n✓ Saved to: {EXTRACTED_DATA}")
+    print(f"  Entities:      {ENTITIES_TABLE}")
+    print(f"  Relationships: {RELATIONSHIPS_TABLE}")
     return data
 
 
@@ -7,50 +7,110 @@ Converts messy extracted types/predicates into DBpedia-style ontology terms.
 Output: step2_refined.json
 """
 
-import json
+import atexit
+import hashlib
 import re
+import shelve
+import string
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import (
-    EXTRACTED_DATA, REFINED_DATA, OUTPUT_DIR,
+    EXTRACTED_DATA, REFINED_DATA, OUTPUT_DIR, CACHE_DIR,
     LLM_MODEL, LLM_BASE_URL
 )
 from steps.prompts import TYPE_PROMPT, PREDICATE_PROMPT
 
 BATCH_SIZE = 10
+LLM_WORKERS = 8  # concurrent Ollama requests
+
+STOP_WORDS = frozenset({'the', 'a', 'an', 'is', 'are', 'was', 'were', 'to', 'of',
+                        'in', 'on', 'at', 'for', 'with', 'and', 'or', 'but'})
+
+# Every byte that is not an ASCII letter/digit, for bytes.translate deletion
+_NON_ALNUM = bytes(
+    b for b in range(256)
+    if chr(b) not in string.ascii_letters + string.digits
+)
+
+# Numbered answer lines ("3. birthPlace") in an LLM response
+_LINE_RE = re.compile(r'^[ \t]*(\d+)\.[ \t]*(\w+)', re.MULTILINE)
+
+# One keep-alive connection per worker, reused across all batches
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_maxsize=LLM_WORKERS))
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=LLM_WORKERS))
+
+_GENERATE_OPTIONS = {"temperature": 0.1}
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Responses persisted across runs, keyed by model + prompt. The shelf is
+# opened on first use and shared by the worker threads under a lock.
+LLM_CACHE_FILE = CACHE_DIR / "llm_cache"
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def strip_non_alnum(s: str) -> str:
+    """Drop every character outside [a-zA-Z0-9]."""
+    return s.encode('ascii', 'ignore').translate(None, _NON_ALNUM).decode('ascii')
+
+
+def _open_llm_cache() -> shelve.Shelf:
+    global _llm_cache
+    if _llm_cache is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _llm_cache = shelve.open(str(LLM_CACHE_FILE))
+        atexit.register(_llm_cache.close)
+    return _llm_cache
 
 
 def call_ollama(prompt: str) -> str:
-    """Call Ollama API."""
+    """Call Ollama API, reusing the cached response for a repeated prompt."""
+    key = hashlib.sha1(f"{LLM_MODEL}\x00{prompt}".encode()).hexdigest()
+    with _llm_cache_lock:
+        cached = _open_llm_cache().get(key)
+    if cached is not None:
+        return cached
+
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{LLM_BASE_URL}/api/generate",
-            json={
+            data=orjson.dumps({
                 "model": LLM_MODEL,
                 "prompt": prompt,
                 "stream": False,
-                "options": {"temperature": 0.1}
-            },
+                "options": _GENERATE_OPTIONS
+            }),
+            headers=_JSON_HEADERS,
             timeout=120
         )
         response.raise_for_status()
-        return response.json().get("response", "").strip()
+        result = orjson.loads(response.content).get("response", "").strip()
     except Exception as e:
         print(f"    LLM error: {e}")
         return ""
 
+    if result:
+        with _llm_cache_lock:
+            _llm_cache[key] = result
+    return result
+
 
 def check_llm_available() -> bool:
     """Check if Ollama is running."""
     try:
-        response = requests.get(f"{LLM_BASE_URL}/api/tags", timeout=5)
+        response = _SESSION.get(f"{LLM_BASE_URL}/api/tags", timeout=5)
         if response.status_code == 200:
-            models = [m["name"] for m in response.json().get("models", [])]
+            models = [m["name"] for m in orjson.loads(response.content).get("models", [])]
             if any(LLM_MODEL in m for m in models):
                 return True
             print(f"  Model '{LLM_MODEL}' not found. Available: {models}")
@@ -63,20 +123,31 @@ def heuristic_type(type_name: str) -> str:
     """Simple PascalCase conversion."""
     words = type_name.split()
     result = ''.join(word.capitalize() for word in words)
-    return re.sub(r'[^a-zA-Z0-9]', '', result) or "Thing"
+    return strip_non_alnum(result) or "Thing"
 
 
 def heuristic_predicate(desc: str) -> str:
     """Simple camelCase extraction."""
-    stop_words = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'to', 'of',
-                  'in', 'on', 'at', 'for', 'with', 'and', 'or', 'but'}
-    words = [w for w in desc.lower().split() if w not in stop_words and len(w) > 2][:3]
+    words = [w for w in desc.lower().split() if w not in STOP_WORDS and len(w) > 2][:3]
     if words:
         result = words[0] + ''.join(w.capitalize() for w in words[1:])
-        return re.sub(r'[^a-zA-Z0-9]', '', result)
+        return strip_non_alnum(result)
     return "relatedTo"
 
 
+def normalize_term(term: str) -> str:
+    """Case- and whitespace-insensitive key for spotting duplicate inputs."""
+    return ' '.join(term.lower().split())
+
+
+def representatives(terms) -> dict[str, str]:
+    """Map each normalized term to the first original spelling seen."""
+    reps = {}
+    for term in terms:
+        reps.setdefault(normalize_term(term), term)
+    return reps
+
+
 def refine_types_batch(types_data: dict) -> dict:
     """Refine all types in one LLM call."""
     type_list = list(types_data.keys())
@@ -86,12 +157,10 @@ def refine_types_batch(types_data: dict) -> dict:
     result = call_ollama(prompt)
     
     refined = {}
-    for line in result.split('\n'):
-        match = re.match(r'(\d+)\.\s*(\w+)', line.strip())
-        if match:
-            idx = int(match.group(1)) - 1
-            if 0 <= idx < len(type_list):
-                refined[type_list[idx]] = match.group(2)
+    for match in _LINE_RE.finditer(result):
+        idx = int(match.group(1)) - 1
+        if 0 <= idx < len(type_list):
+            refined[type_list[idx]] = match.group(2)
     
     for t in type_list:
         if t not in refined:
@@ -115,16 +184,14 @@ def refine_predicates_batch(batch_items: list) -> dict:
     result = call_ollama(prompt)
     
     refined = {}
-    for line in result.split('\n'):
-        match = re.match(r'(\d+)\.\s*(\w+)', line.strip())
-        if match:
-            idx = int(match.group(1)) - 1
-            if 0 <= idx < len(batch_items):
-                pred = match.group(2)
-                if pred:
-                    pred = pred[0].lower() + pred[1:] if len(pred) > 1 else pred.lower()
-                desc = batch_items[idx][0]
-                refined[desc] = pred
+    for match in _LINE_RE.finditer(result):
+        idx = int(match.group(1)) - 1
+        if 0 <= idx < len(batch_items):
+            pred = match.group(2)
+            if pred:
+                pred = pred[0].lower() + pred[1:] if len(pred) > 1 else pred.lower()
+            desc = batch_items[idx][0]
+            refined[desc] = pred
     
     for desc, src, tgt in batch_items:
         if desc not in refined:
@@ -133,18 +200,19 @@ def refine_predicates_batch(batch_items: list) -> dict:
     return refined
 
 
-def run():
-    """Run step 2."""
+def run(data: dict = None):
+    """Run step 2 on step 1's result, or on EXTRACTED_DATA if not given."""
     print("\n" + "=" * 80)
     print("STEP 2: REFINE TYPES AND PREDICATES WITH LLM")
     print("=" * 80)
 
-    if not EXTRACTED_DATA.exists():
-        print(f"Error: {EXTRACTED_DATA} not found. Run step 1 first.")
-        return None
+    if data is None:
+        if not EXTRACTED_DATA.exists():
+            print(f"Error: {EXTRACTED_DATA} not found. Run step 1 first.")
+            return None
 
-    with open(EXTRACTED_DATA) as f:
-        data = json.load(f)
+        with open(EXTRACTED_DATA, 'rb') as f:
+            data = orjson.loads(f.read())
 
     num_types = len(data['types'])
     num_preds = len(data['predicates'])
@@ -165,14 +233,21 @@ def run():
     print("ENTITY TYPES" + (" (LLM)" if use_llm else " (heuristic)"))
     print("-" * 80)
     
+    # Only one spelling of each type is refined; the others share its result
+    type_reps = representatives(data["types"])
+    if len(type_reps) < num_types:
+        print(f"  {num_types - len(type_reps)} duplicate types after normalization")
+
     if use_llm:
-        type_mappings = refine_types_batch(data["types"])
+        type_mappings = refine_types_batch(
+            {t: data["types"][t] for t in type_reps.values()})
     else:
-        type_mappings = {t: heuristic_type(t) for t in data["types"]}
+        type_mappings = {t: heuristic_type(t) for t in type_reps.values()}
     
     refined_types = {}
     for type_name, info in data["types"].items():
-        refined = type_mappings.get(type_name, heuristic_type(type_name))
+        rep = type_reps[normalize_term(type_name)]
+        refined = type_mappings.get(rep, heuristic_type(rep))
         refined_types[type_name] = {**info, "refined": refined}
         print(f"  \"{type_name}\" → {refined}")
 
@@ -181,8 +256,13 @@ def run():
     print("RELATIONSHIP PREDICATES" + (" (LLM)" if use_llm else " (heuristic)"))
     print("-" * 80)
     
+    pred_reps = representatives(data["predicates"])
+    if len(pred_reps) < num_preds:
+        print(f"  {num_preds - len(pred_reps)} duplicate predicates after normalization")
+
     pred_items = []
-    for desc, info in data["predicates"].items():
+    for desc in pred_reps.values():
+        info = data["predicates"][desc]
         source = info.get("example_source", "?")
         target = info.get("example_target", "?")
         pred_items.append((desc, source, target))
@@ -191,25 +271,29 @@ def run():
     
     pred_mappings = {}
     if use_llm:
-        for i in range(0, len(pred_items), BATCH_SIZE):
-            batch = pred_items[i:i+BATCH_SIZE]
-            batch_num = i // BATCH_SIZE + 1
-            
-            print(f"\n[Batch {batch_num}/{num_batches}]")
-            print("-" * 40)
-            
-            for desc, src, tgt in batch:
-                short_desc = desc[:60] + "..." if len(desc) > 60 else desc
-                print(f"  {src} → {tgt}")
-                print(f"    \"{short_desc}\"")
-            
-            batch_results = refine_predicates_batch(batch)
-            pred_mappings.update(batch_results)
-            
-            print("\n  Results:")
-            for desc, src, tgt in batch:
-                refined = batch_results.get(desc, "?")
-                print(f"    {src} → {tgt} : {refined}")
+        batches = [pred_items[i:i + BATCH_SIZE]
+                   for i in range(0, len(pred_items), BATCH_SIZE)]
+
+        # Batches are independent, so overlap the LLM round-trips; map()
+        # yields results in submission order, keeping the log readable.
+        with ThreadPoolExecutor(max_workers=LLM_WORKERS) as executor:
+            results = executor.map(refine_predicates_batch, batches)
+            for batch_num, (batch, batch_results) in enumerate(
+                    zip(batches, results), start=1):
+                print(f"\n[Batch {batch_num}/{num_batches}]")
+                print("-" * 40)
+
+                for desc, src, tgt in batch:
+                    short_desc = desc[:60] + "..." if len(desc) > 60 else desc
+                    print(f"  {src} → {tgt}")
+                    print(f"    \"{short_desc}\"")
+
+                pred_mappings.update(batch_results)
+
+                print("\n  Results:")
+                for desc, src, tgt in batch:
+                    refined = batch_results.get(desc, "?")
+                    print(f"    {src} → {tgt} : {refined}")
     else:
         for desc, src, tgt in pred_items:
             refined = heuristic_predicate(desc)
@@ -220,15 +304,14 @@ def run():
     
     refined_predicates = {}
     for desc, info in data["predicates"].items():
-        refined = pred_mappings.get(desc, heuristic_predicate(desc))
+        rep = pred_reps[normalize_term(desc)]
+        refined = pred_mappings.get(rep, heuristic_predicate(rep))
         refined_predicates[desc] = {**info, "refined": refined}
 
     # === SAVE ===
     refined = {
         "types": refined_types,
-        "predicates": refined_predicates,
-        "entities": data["entities"],
-        "relationships": data["relationships"]
+        "predicates": refined_predicates
     }
 
     print("\n" + "-" * 80)
@@ -238,11 +321,12 @@ def run():
     print(f"  Predicates refined: {len(refined_predicates)}")
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(REFINED_DATA, 'w') as f:
-        json.dump(refined, f, indent=2)
+    with open(REFINED_DATA, 'wb') as f:
+        f.write(orjson.dumps(refined))
 
     print(f"\n✓ Saved: {REFINED_DATA}")
-    return refined
+    # used_llm tells run_pipeline not to mark heuristic-only output up to date
+    return {**refined, "used_llm": use_llm}
 
 
 if __name__ == "__main__":
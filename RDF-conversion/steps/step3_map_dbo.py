@@ -17,27 +17,98 @@ from config import (
     EMBEDDING_MODEL, DBPEDIA_SPARQL_ENDPOINT,
     FALLBACK_PREDICATE, DBO_NS
 )
-import json
+import hashlib
+import importlib.metadata
+import importlib.util
+import io
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from SPARQLWrapper import SPARQLWrapper, JSON
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+from SPARQLWrapper import SPARQLWrapper, CSV
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# ONNX Runtime encodes noticeably faster than torch on CPU; it is used when
+# sentence-transformers' ONNX extras (optimum + onnxruntime) are installed
+EMBEDDING_BACKEND = (
+    "onnx" if importlib.util.find_spec("onnxruntime")
+    and importlib.util.find_spec("optimum") else "torch"
+)
+
+# Written when the ONNX load fails, so later runs go straight to torch (and
+# look up the torch-keyed embedding cache) until the installed stack changes
+ONNX_FALLBACK_FILE = CACHE_DIR / "onnx_fallback"
+
+
+def cpu_has_bf16() -> bool:
+    """True if the CPU has native bf16 matmul (AVX512-BF16 or AMX)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+# Without native support bf16 autocast is emulated and slower than float32
+CPU_BF16 = cpu_has_bf16()
 
 # ============================================================================
 # DBPEDIA ONTOLOGY FETCHERS
 # ============================================================================
 
+def parse_dbo_csv(raw: bytes, column: str, exclude_pattern: str) -> dict[str, str]:
+    """
+    Turn SPARQL CSV results (column, label, comment) into {name: description}.
+
+    Names whose local part matches exclude_pattern are dropped. Missing
+    labels fall back to the name; descriptions are "label: comment".
+    """
+    table = pv.read_csv(
+        io.BytesIO(raw),
+        # rdfs:comment values can span lines (quoted in the CSV)
+        parse_options=pv.ParseOptions(newlines_in_values=True),
+        convert_options=pv.ConvertOptions(column_types={
+            column: pa.string(), "label": pa.string(), "comment": pa.string()
+        })
+    )
+    names = pc.replace_substring(table[column], "http://dbpedia.org/ontology/", "")
+    labels = pc.if_else(pc.equal(table["label"], ""), names, table["label"])
+    comments = table["comment"]
+    descriptions = pc.if_else(
+        pc.equal(comments, ""),
+        labels,
+        pc.binary_join_element_wise(labels, comments, ": ")
+    )
+
+    keep = pc.invert(pc.match_substring_regex(names, exclude_pattern))
+    return dict(zip(names.filter(keep).to_pylist(),
+                    descriptions.filter(keep).to_pylist()))
+
+
 def fetch_dbo_classes() -> dict[str, str]:
     """Fetch DBpedia ontology classes via SPARQL."""
     print("  Fetching DBpedia classes via SPARQL...")
 
     sparql = SPARQLWrapper(DBPEDIA_SPARQL_ENDPOINT)
-    sparql.setReturnFormat(JSON)
+    sparql.setReturnFormat(CSV)
     sparql.setQuery("""
         PREFIX dbo: <http://dbpedia.org/ontology/>
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
@@ -52,21 +123,11 @@ def fetch_dbo_classes() -> dict[str, str]:
     """)
 
     try:
-        results = sparql.query().convert()["results"]["bindings"]
+        classes = parse_dbo_csv(sparql.query().convert(), "class", r"[/(]")
     except Exception as e:
         print(f"  SPARQL failed: {e}")
         return {}
 
-    classes = {}
-    for r in results:
-        uri = r["class"]["value"]
-        name = uri.replace("http://dbpedia.org/ontology/", "")
-        if "/" in name or "(" in name:
-            continue
-        label = r.get("label", {}).get("value", name)
-        comment = r.get("comment", {}).get("value", "")
-        classes[name] = f"{label}: {comment}" if comment else label
-
     print(f"  Found {len(classes)} classes")
     return classes
 
@@ -76,7 +137,7 @@ def fetch_dbo_properties() -> dict[str, str]:
     print("  Fetching DBpedia properties via SPARQL...")
 
     sparql = SPARQLWrapper(DBPEDIA_SPARQL_ENDPOINT)
-    sparql.setReturnFormat(JSON)
+    sparql.setReturnFormat(CSV)
     sparql.setQuery("""
         PREFIX dbo: <http://dbpedia.org/ontology/>
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
@@ -94,21 +155,11 @@ def fetch_dbo_properties() -> dict[str, str]:
     """)
 
     try:
-        results = sparql.query().convert()["results"]["bindings"]
+        props = parse_dbo_csv(sparql.query().convert(), "prop", r"/")
     except Exception as e:
         print(f"  SPARQL failed: {e}")
         return {}
 
-    props = {}
-    for r in results:
-        uri = r["prop"]["value"]
-        name = uri.replace("http://dbpedia.org/ontology/", "")
-        if "/" in name:
-            continue
-        label = r.get("label", {}).get("value", name)
-        comment = r.get("comment", {}).get("value", "")
-        props[name] = f"{label}: {comment}" if comment else label
-
     print(f"  Found {len(props)} properties")
     return props
 
@@ -119,15 +170,15 @@ def load_or_fetch(cache_file: Path, fetch_func) -> dict[str, str]:
 
     if cache_file.exists():
         print(f"  Loading from cache: {cache_file.name}")
-        with open(cache_file) as f:
-            data = json.load(f)
+        with open(cache_file, 'rb') as f:
+            data = orjson.loads(f.read())
         print(f"  Loaded {len(data)} items")
         return data
 
     data = fetch_func()
     if data:
-        with open(cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(cache_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         print(f"  Cached to {cache_file.name}")
     return data
 
@@ -136,47 +187,257 @@ def load_or_fetch(cache_file: Path, fetch_func) -> dict[str, str]:
 # EMBEDDING-BASED MAPPER
 # ============================================================================
 
+def onnx_stack() -> str:
+    """Embedding model plus the package versions the ONNX load depends on."""
+    versions = []
+    for package in ("sentence-transformers", "optimum", "onnxruntime"):
+        try:
+            versions.append(importlib.metadata.version(package))
+        except importlib.metadata.PackageNotFoundError:
+            versions.append("?")
+    return "\x00".join([EMBEDDING_MODEL, *versions])
+
+
+def initial_backend() -> str:
+    """EMBEDDING_BACKEND, unless ONNX already failed with this stack."""
+    if (EMBEDDING_BACKEND == "onnx" and ONNX_FALLBACK_FILE.exists()
+            and ONNX_FALLBACK_FILE.read_text() == onnx_stack()):
+        return "torch"
+    return EMBEDDING_BACKEND
+
+
+def quantize_int8(emb: np.ndarray) -> np.ndarray:
+    """Map L2-normalized float rows onto int8 (components lie in [-1, 1])."""
+    return np.round(emb * 127).astype(np.int8)
+
+
+def embedding_cache_path(key: str, texts: list[str], backend: str) -> Path:
+    """Cache file for the embeddings of texts under the current model."""
+    digest = hashlib.sha1(
+        (f"{EMBEDDING_MODEL}\x00{backend}\x00" + "\x00".join(texts)).encode()
+    ).hexdigest()
+    return CACHE_DIR / f"emb_{key}_{digest}.npy"
+
+
 class EmbeddingMapper:
     """Maps terms to DBpedia using embedding similarity."""
 
     def __init__(self):
         self.model = None
+        self.backend = initial_backend()
         self._embeddings = {}
+        self._quantized = {}
+        self._faiss = {}
+        self._cand_names = {}
+        self._cand_descs = {}
 
     def _load_model(self):
-        if self.model is None:
-            print(f"  Loading embedding model: {EMBEDDING_MODEL}")
-            self.model = SentenceTransformer(EMBEDDING_MODEL)
+        if self.model is not None:
+            return
+        # torch/sentence-transformers take seconds to import; only pay for
+        # that when something actually has to be encoded
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        print(f"  Loading embedding model: {EMBEDDING_MODEL} ({self.backend})")
+        if self.backend == "onnx":
+            try:
+                self.model = SentenceTransformer(EMBEDDING_MODEL, backend="onnx")
+                return
+            except Exception as e:
+                print(f"  ONNX backend unavailable ({e}), falling back to torch")
+                self.backend = "torch"
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                ONNX_FALLBACK_FILE.write_text(onnx_stack())
+        torch.set_num_threads(os.cpu_count())
+        self.model = SentenceTransformer(EMBEDDING_MODEL)
+
+    def _use_bf16(self) -> bool:
+        if self.backend != "torch" or not CPU_BF16:
+            return False
+        import torch
+        return not torch.cuda.is_available()
+
+    def _variant(self) -> str:
+        """
+        Backend and precision the embeddings come from, for cache keys.
+
+        Deliberately skips _use_bf16's CUDA check, so that cache lookups
+        never import torch.
+        """
+        if self.backend == "torch" and CPU_BF16:
+            return "torch+bf16"
+        return self.backend
+
+    def encode_groups(self, groups: dict[str, list[str]]) -> dict[str, np.ndarray]:
+        """
+        Encode several text groups with a single model.encode call.
+
+        Groups already encoded in an earlier run are loaded from CACHE_DIR
+        instead of being re-encoded. Empty groups get a (0, dim) matrix
+        without touching the model.
+        """
+        pending = {}
+        empty = []
+        for key, texts in groups.items():
+            if key in self._embeddings:
+                continue
+            if not texts:
+                empty.append(key)
+                continue
+            cache_file = embedding_cache_path(key, texts, self._variant())
+            if cache_file.exists():
+                print(f"  Loading cached embeddings: {cache_file.name}")
+                self._embeddings[key] = np.ascontiguousarray(
+                    np.load(cache_file), dtype=np.float32)
+            else:
+                pending[key] = texts
+        if pending:
+            self._encode_pending(pending)
+        if empty:
+            dim = self._embedding_dim()
+            for key in empty:
+                self._embeddings[key] = np.empty((0, dim), dtype=np.float32)
+        return {key: self._embeddings[key] for key in groups}
+
+    def _embedding_dim(self) -> int:
+        """Embedding width, from a group already in memory if possible."""
+        for emb in self._embeddings.values():
+            if len(emb):
+                return emb.shape[1]
+        self._load_model()
+        return self.model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: list[str], label: str) -> np.ndarray:
+        """Encode texts into a C-contiguous float32 matrix of unit rows."""
+        import torch
+
+        self._load_model()
+
+        # Many types/predicates refine to the same term: encode each
+        # distinct text once and fan the rows back out afterwards. Sorting
+        # by length keeps similar lengths in a batch, so less is padded.
+        unique = sorted(dict.fromkeys(texts), key=len)
+        print(f"  Computing embeddings for {len(unique)} unique texts ({label})...")
+        # One in-process encode: torch already spreads it over every core,
+        # while a worker-process pool would oversubscribe the CPU and load
+        # the model again in every worker. No autograd bookkeeping; bf16
+        # matmuls where the CPU has them.
+        with torch.inference_mode(), torch.autocast(
+                "cpu", dtype=torch.bfloat16, enabled=self._use_bf16()):
+            unique_emb = self.model.encode(
+                unique, batch_size=256, normalize_embeddings=False,
+                convert_to_numpy=True, show_progress_bar=True
+            )
+        # L2-normalize the whole batch in one vectorized step, so that
+        # similarity is a plain dot product
+        unique_emb = np.asarray(unique_emb, dtype=np.float32)
+        unique_emb /= np.linalg.norm(unique_emb, axis=-1, keepdims=True) + 1e-12
+
+        row = {text: i for i, text in enumerate(unique)}
+        emb = unique_emb[[row[t] for t in texts]]
+
+        # Embeddings are stored as float16 (half the cache size) but kept in
+        # float32 for the BLAS similarity math. Rounding fresh results the
+        # same way keeps cold and cached runs identical.
+        return np.ascontiguousarray(emb.astype(np.float16), dtype=np.float32)
+
+    def _encode_pending(self, pending: dict[str, list[str]]):
+        texts = [t for group in pending.values() for t in group]
+        emb = self._encode(texts, ", ".join(pending))
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        start = 0
+        for key, group in pending.items():
+            self._embeddings[key] = emb[start:start + len(group)]
+            start += len(group)
+            cache_file = embedding_cache_path(key, group, self._variant())
+            # Older encodings of this group (other texts/model) are stale
+            for stale in CACHE_DIR.glob(f"emb_{key}_*.npy"):
+                stale.unlink()
+            np.save(cache_file, self._embeddings[key].astype(np.float16))
 
     def _get_embeddings(self, texts: list[str], key: str):
         """Get embeddings with caching."""
-        if key not in self._embeddings:
-            self._load_model()
-            print(f"  Computing embeddings for {len(texts)} {key}...")
-            self._embeddings[key] = self.model.encode(
-                texts, normalize_embeddings=True, show_progress_bar=True
-            )
-        return self._embeddings[key]
+        return self.encode_groups({key: texts})[key]
 
-    def find_best_match(
+    def best_matches(
         self,
-        query: str,
+        query_emb: np.ndarray,
         candidates: dict[str, str],
         cache_key: str
-    ) -> tuple[str, float]:
-        """Find best matching candidate using cosine similarity."""
-        self._load_model()
-
-        names = list(candidates.keys())
-        descriptions = list(candidates.values())
-
-        cand_emb = self._get_embeddings(descriptions, cache_key)
-        query_emb = self.model.encode([query], normalize_embeddings=True)[0]
-
-        similarities = np.dot(cand_emb, query_emb)
-        best_idx = np.argmax(similarities)
+    ) -> list[tuple[str, float]]:
+        """Best candidate for every encoded query, via one matrix product."""
+        if len(query_emb) == 0:
+            return []
+
+        # Candidate sets are fixed per cache_key: list them out only once
+        if cache_key not in self._cand_names:
+            self._cand_names[cache_key] = list(candidates.keys())
+            self._cand_descs[cache_key] = list(candidates.values())
+        names = self._cand_names[cache_key]
+
+        cand_emb = self._get_embeddings(self._cand_descs[cache_key], cache_key)
+
+        if faiss is not None:
+            # Exact inner-product (= cosine) search with FAISS' SIMD kernels
+            if cache_key not in self._faiss:
+                index = faiss.IndexFlatIP(cand_emb.shape[1])
+                index.add(cand_emb)
+                self._faiss[cache_key] = index
+            scores, indices = self._faiss[cache_key].search(
+                np.ascontiguousarray(query_emb, dtype=np.float32), 1)
+            best_idx, best_scores = indices[:, 0], scores[:, 0]
+        elif simsimd is not None:
+            # int8 cosine search (VNNI kernels, a quarter of the float32
+            # bandwidth); the winners are re-scored exactly in float32
+            if cache_key not in self._quantized:
+                self._quantized[cache_key] = quantize_int8(cand_emb)
+            distances = simsimd.cdist(
+                quantize_int8(query_emb), self._quantized[cache_key], "cos")
+            best_idx = np.asarray(distances).argmin(axis=1)
+            best_scores = np.einsum("ij,ij->i", query_emb, cand_emb[best_idx])
+        else:
+            # Rows are L2-normalized, so this is the full cosine-similarity matrix
+            similarities = query_emb @ cand_emb.T
+            best_idx = similarities.argmax(axis=1)
+            best_scores = similarities[np.arange(len(best_idx)), best_idx]
+
+        return [(names[i], float(score)) for i, score in zip(best_idx, best_scores)]
+
+
+def apply_matches(
+    items: dict,
+    matches: list[tuple[str, float]],
+    uris: dict[str, str],
+    threshold: float,
+    field: str,
+    fallback: str
+) -> tuple[dict, int]:
+    """
+    Attach each item's best DBpedia match, or the fallback below threshold.
 
-        return names[best_idx], float(similarities[best_idx])
+    uris maps every candidate name to its DBpedia URI. field names the
+    matched term ("dbo_class"/"dbo_property"). The info dicts of items are
+    extended in place, not copied. Returns the mapped items and how many
+    of them cleared the threshold.
+    """
+    fallback_uri = f"{DBO_NS}{fallback}"
+    mapped = {}
+    num_mapped = 0
+    for (orig, info), (best, score) in zip(items.items(), matches):
+        if score >= threshold:
+            info[field] = best
+            info["dbo_uri"] = uris[best]
+            info["similarity"] = round(score, 3)
+            num_mapped += 1
+        else:
+            info[field] = fallback
+            info["dbo_uri"] = fallback_uri
+            info["similarity"] = round(score, 3)
+            info["fallback"] = True
+            info["best_match"] = best
+        mapped[orig] = info
+    return mapped, num_mapped
 
 
 def map_to_dbo(data: dict, dbo_classes: dict, dbo_props: dict) -> dict:
@@ -185,42 +446,41 @@ def map_to_dbo(data: dict, dbo_classes: dict, dbo_props: dict) -> dict:
     """
     mapper = EmbeddingMapper()
 
+    # Encode the ontology and all queries in one batched pass
+    embeddings = mapper.encode_groups({
+        "classes": list(dbo_classes.values()),
+        "properties": list(dbo_props.values()),
+        "types": [info["refined"] for info in data["types"].values()],
+        "predicates": [info["refined"] for info in data["predicates"].values()],
+    })
+
+    # One similarity search per candidate set, both over the same encodings
+    type_matches = mapper.best_matches(embeddings["types"], dbo_classes, "classes")
+    pred_matches = mapper.best_matches(
+        embeddings["predicates"], dbo_props, "properties")
+
+    class_uris = {name: f"{DBO_NS}{name}" for name in dbo_classes}
+    prop_uris = {name: f"{DBO_NS}{name}" for name in dbo_props}
+
     # -------------------------------------------------------------------------
     # Map types to DBpedia classes
     # -------------------------------------------------------------------------
     print("\nMapping types to DBpedia classes...")
     print(f"  Threshold: {TYPE_SIMILARITY_THRESHOLD}")
 
-    mapped_types = {}
-    type_mapped = type_fallback = 0
-
-    for orig_type, info in data["types"].items():
-        refined = info["refined"]
-        best_class, score = mapper.find_best_match(
-            refined, dbo_classes, "classes")
-
-        if score >= TYPE_SIMILARITY_THRESHOLD:
-            mapped_types[orig_type] = {
-                **info,
-                "dbo_class": best_class,
-                "dbo_uri": f"{DBO_NS}{best_class}",
-                "similarity": round(score, 3)
-            }
-            type_mapped += 1
-        else:
-            # Fallback: use dbo:Thing
-            mapped_types[orig_type] = {
-                **info,
-                "dbo_class": "Thing",
-                "dbo_uri": f"{DBO_NS}Thing",
-                "similarity": round(score, 3),
-                "fallback": True,
-                "best_match": best_class
-            }
-            type_fallback += 1
-
-        print(
-            f"    {refined:25} → dbo:{mapped_types[orig_type]['dbo_class']:20} [{score:.3f}]")
+    # Fallback: use dbo:Thing
+    mapped_types, type_mapped = apply_matches(
+        data["types"], type_matches, class_uris, TYPE_SIMILARITY_THRESHOLD,
+        "dbo_class", "Thing")
+    type_fallback = len(mapped_types) - type_mapped
+
+    # One write for the whole listing instead of a print per type
+    log_lines = [
+        f"    {info['refined']:25} → dbo:{info['dbo_class']:20} [{score:.3f}]"
+        for info, (_, score) in zip(mapped_types.values(), type_matches)
+    ]
+    if log_lines:
+        print("\n".join(log_lines))
 
     print(
         f"  Results: {type_mapped} mapped, {type_fallback} fallback to Thing")
@@ -231,67 +491,51 @@ def map_to_dbo(data: dict, dbo_classes: dict, dbo_props: dict) -> dict:
     print("\nMapping predicates to DBpedia properties...")
     print(f"  Threshold: {PREDICATE_SIMILARITY_THRESHOLD}")
 
-    mapped_predicates = {}
-    pred_mapped = pred_fallback = 0
-
-    for orig_desc, info in data["predicates"].items():
-        refined = info["refined"]
-        best_prop, score = mapper.find_best_match(
-            refined, dbo_props, "properties")
-
-        if score >= PREDICATE_SIMILARITY_THRESHOLD:
-            mapped_predicates[orig_desc] = {
-                **info,
-                "dbo_property": best_prop,
-                "dbo_uri": f"{DBO_NS}{best_prop}",
-                "similarity": round(score, 3)
-            }
-            pred_mapped += 1
-        else:
-            # Fallback: use generic link predicate
-            mapped_predicates[orig_desc] = {
-                **info,
-                "dbo_property": FALLBACK_PREDICATE,
-                "dbo_uri": f"{DBO_NS}{FALLBACK_PREDICATE}",
-                "similarity": round(score, 3),
-                "fallback": True,
-                "best_match": best_prop
-            }
-            pred_fallback += 1
-
-    # Show progress
-    total = len(mapped_predicates)
+    # Fallback: use generic link predicate
+    mapped_predicates, pred_mapped = apply_matches(
+        data["predicates"], pred_matches, prop_uris,
+        PREDICATE_SIMILARITY_THRESHOLD, "dbo_property", FALLBACK_PREDICATE)
+    pred_fallback = len(mapped_predicates) - pred_mapped
+
     print(
         f"  Results: {pred_mapped} mapped, {pred_fallback} fallback to {FALLBACK_PREDICATE}")
 
     return {
         "types": mapped_types,
-        "predicates": mapped_predicates,
-        "entities": data["entities"],
-        "relationships": data["relationships"]
+        "predicates": mapped_predicates
     }
 
 
-def run():
-    """Run step 3."""
+def run(data: dict = None):
+    """Run step 3 on step 2's result, or on REFINED_DATA if not given."""
     print("Step 3: Mapping to DBpedia Ontology")
     print("=" * 60)
 
     # Load refined data
-    if not REFINED_DATA.exists():
-        print(f"Error: {REFINED_DATA} not found. Run step 2 first.")
-        return None
+    if data is None:
+        if not REFINED_DATA.exists():
+            print(f"Error: {REFINED_DATA} not found. Run step 2 first.")
+            return None
 
-    with open(REFINED_DATA) as f:
-        data = json.load(f)
+        with open(REFINED_DATA, 'rb') as f:
+            data = orjson.loads(f.read())
 
     print(
         f"Loaded {len(data['types'])} types and {len(data['predicates'])} predicates")
 
     # Load DBpedia ontology
     print("\nLoading DBpedia ontology...")
-    dbo_classes = load_or_fetch(DBO_CLASSES_CACHE, fetch_dbo_classes)
-    dbo_props = load_or_fetch(DBO_PROPERTIES_CACHE, fetch_dbo_properties)
+    if DBO_CLASSES_CACHE.exists() or DBO_PROPERTIES_CACHE.exists():
+        dbo_classes = load_or_fetch(DBO_CLASSES_CACHE, fetch_dbo_classes)
+        dbo_props = load_or_fetch(DBO_PROPERTIES_CACHE, fetch_dbo_properties)
+    else:
+        # Cold cache: run both SPARQL queries against the endpoint at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            classes = executor.submit(
+                load_or_fetch, DBO_CLASSES_CACHE, fetch_dbo_classes)
+            props = executor.submit(
+                load_or_fetch, DBO_PROPERTIES_CACHE, fetch_dbo_properties)
+            dbo_classes, dbo_props = classes.result(), props.result()
 
     if not dbo_classes or not dbo_props:
         print("Error: Could not load DBpedia ontology")
@@ -302,8 +546,8 @@ def run():
 
     # Save output
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(MAPPED_DATA, 'w') as f:
-        json.dump(mapped, f, indent=2)
+    with open(MAPPED_DATA, 'wb') as f:
+        f.write(orjson.dumps(mapped, option=orjson.OPT_INDENT_2))
 
     print(f"\n✓ Saved to: {MAPPED_DATA}")
     return mapped
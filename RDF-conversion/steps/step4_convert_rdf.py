@@ -13,19 +13,29 @@ from config import (
     MAPPED_DATA, FINAL_RDF, OUTPUT_DIR,
     GRAPHRAG_NS, DBO_NS, FALLBACK_TYPE
 )
-import json
 import sys
+from itertools import chain, islice
 from pathlib import Path
 from urllib.parse import quote
 
-from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef
+import orjson
+import pyarrow.feather as feather
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from steps.step1_extract import ENTITIES_TABLE, RELATIONSHIPS_TABLE
 
-# Namespaces
-GRAPHRAG = Namespace(GRAPHRAG_NS)
-DBO = Namespace(DBO_NS)
+
+# Terms are written as full <IRI>s: percent-encoded entity names are not
+# always valid prefixed names (e.g. a leading "-" or a trailing ".")
+RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+RDFS_LABEL = "<http://www.w3.org/2000/01/rdf-schema#label>"
+WIKI_LINK = f"<{DBO_NS}wikiPageWikiLink>"
+
+# Characters that must be escaped inside a "..." Turtle string literal
+_LITERAL_ESCAPES = str.maketrans({
+    "\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"
+})
 
 
 def create_entity_uri(name: str, entity_id: str) -> str:
@@ -34,19 +44,26 @@ def create_entity_uri(name: str, entity_id: str) -> str:
     return f"{safe_name}_{entity_id}"
 
 
-def convert_to_rdf(data: dict) -> Graph:
+def create_entity_uris(names: list[str], entity_ids: list[str]) -> list[str]:
+    """create_entity_uri over whole columns."""
+    return [create_entity_uri(name, entity_id)
+            for name, entity_id in zip(names, entity_ids)]
+
+
+def turtle_quote(s: str) -> str:
+    """Quote s as a Turtle string literal."""
+    return f'"{s.translate(_LITERAL_ESCAPES)}"'
+
+
+def convert_to_rdf(data: dict) -> list[str]:
     """
-    Convert mapped data to RDF graph.
+    Convert mapped data to Turtle statements, one triple per line.
+
+    Duplicate triples are dropped and the rest sorted as plain strings,
+    which keeps the output deterministic and grouped by subject.
     """
     print("\nBuilding RDF graph...")
 
-    graph = Graph()
-    graph.bind("gr", GRAPHRAG)
-    graph.bind("dbo", DBO)
-
-    # Build entity lookup: name -> {uri, type_uri}
-    entity_lookup = {}
-
     # Create type lookup: original_type -> dbo_uri
     type_lookup = {
         orig: info["dbo_uri"]
@@ -63,39 +80,39 @@ def convert_to_rdf(data: dict) -> Graph:
     # Add entities
     # -------------------------------------------------------------------------
     print("  Adding entities...")
-    entities_added = 0
-    entities_typed = 0
-    entities_fallback = 0
-
-    for entity in data["entities"]:
-        entity_id = entity["id"]
-        name = entity["name"]
-        orig_type = entity.get("original_type", "")
-
-        # Create entity URI
-        uri_id = create_entity_uri(name, entity_id)
-        entity_uri = GRAPHRAG[uri_id]
-
-        # Store in lookup
-        entity_lookup[name] = entity_uri
-
-        # Add label
-        graph.add((entity_uri, RDFS.label, Literal(name)))
-
-        # Add type - use mapped type if available, otherwise fallback to owl:Thing
-        # This ensures all entities have at least one type for SDType/SDValidate
-        # See: Paulheim & Bizer (2014) "Improving the Quality of Linked Data Using Statistical Distributions"
-        if orig_type and orig_type in type_lookup:
-            type_uri = URIRef(type_lookup[orig_type])
-            graph.add((entity_uri, RDF.type, type_uri))
-            entities_typed += 1
-        else:
-            # Fallback type for entities without a mapped type
-            # SDType can infer proper types from relationship patterns
-            graph.add((entity_uri, RDF.type, URIRef(FALLBACK_TYPE)))
-            entities_fallback += 1
-
-        entities_added += 1
+    entities = data["entities"]
+    names = entities["name"].to_pylist()
+    entity_uris = [
+        f"<{GRAPHRAG_NS}{uri_id}>" for uri_id in create_entity_uris(
+            names, entities["id"].to_pylist())
+    ]
+
+    # Build entity lookup: interned name -> index into entity_uris
+    entity_index = {sys.intern(name): i for i, name in enumerate(names)}
+
+    # Add type - use mapped type if available, otherwise fallback to owl:Thing
+    # This ensures all entities have at least one type for SDType/SDValidate
+    # See: Paulheim & Bizer (2014) "Improving the Quality of Linked Data Using Statistical Distributions"
+    # SDType can infer proper types from relationship patterns
+    type_refs = {orig: f"<{uri}>" for orig, uri in type_lookup.items()}
+    fallback_type = f"<{FALLBACK_TYPE}>"
+    entity_types = [
+        type_refs.get(orig_type) if orig_type else None
+        for orig_type in entities["original_type"].to_pylist()
+    ]
+
+    statements = [
+        f"{entity_uri} {RDFS_LABEL} {turtle_quote(name)} .\n"
+        for entity_uri, name in zip(entity_uris, names)
+    ]
+    statements += [
+        f"{entity_uri} {RDF_TYPE} {type_uri or fallback_type} .\n"
+        for entity_uri, type_uri in zip(entity_uris, entity_types)
+    ]
+
+    entities_added = len(entity_uris)
+    entities_fallback = entity_types.count(None)
+    entities_typed = entities_added - entities_fallback
 
     print(f"    {entities_added} entities ({entities_typed} with DBpedia types, {entities_fallback} with owl:Thing fallback)")
 
@@ -103,74 +120,98 @@ def convert_to_rdf(data: dict) -> Graph:
     # Add relationships
     # -------------------------------------------------------------------------
     print("  Adding relationships...")
-    rels_added = 0
-    rels_skipped = 0
-
-    for rel in data["relationships"]:
-        source_name = rel["source"]
-        target_name = rel["target"]
-        orig_desc = rel.get("original_description", "")
+    pred_refs = {orig: f"<{uri}>" for orig, uri in pred_lookup.items()}
 
+    rels_added = 0
+    relationships = data["relationships"]
+    for source_name, target_name, orig_desc in zip(
+            relationships["source"].to_pylist(),
+            relationships["target"].to_pylist(),
+            relationships["original_description"].to_pylist()):
         # Look up entity URIs
-        source_uri = entity_lookup.get(source_name)
-        target_uri = entity_lookup.get(target_name)
+        source_idx = entity_index.get(sys.intern(source_name))
+        target_idx = entity_index.get(sys.intern(target_name))
 
-        if not source_uri or not target_uri:
-            rels_skipped += 1
+        if source_idx is None or target_idx is None:
             continue
 
         # Get predicate URI
-        if orig_desc and orig_desc in pred_lookup:
-            pred_uri = URIRef(pred_lookup[orig_desc])
-        else:
-            pred_uri = DBO.wikiPageWikiLink  # Fallback
-
-        graph.add((source_uri, pred_uri, target_uri))
+        pred_uri = pred_refs.get(orig_desc, WIKI_LINK) if orig_desc else WIKI_LINK
+        statements.append(
+            f"{entity_uris[source_idx]} {pred_uri} {entity_uris[target_idx]} .\n")
         rels_added += 1
 
+    rels_skipped = relationships.num_rows - rels_added
+
     print(f"    {rels_added} relationships ({rels_skipped} skipped)")
 
-    return graph
+    return sorted(set(statements))
+
 
+def write_turtle(statements: list[str], path: Path, preview_lines: int = 30) -> list[str]:
+    """
+    Write Turtle statements to path after the gr/dbo prefix header.
+
+    Returns the first preview_lines + 1 lines written.
+    """
+    header = (f"@prefix gr: <{GRAPHRAG_NS}> .\n", f"@prefix dbo: <{DBO_NS}> .\n", "\n")
+    lines = chain(header, statements)
 
-def run():
-    """Run step 4."""
+    preview = list(islice(lines, preview_lines + 1))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(preview)
+        f.writelines(lines)
+    return preview
+
+
+def run(data: dict = None):
+    """Run step 4 on step 3's result, or on MAPPED_DATA if not given."""
     print("Step 4: Converting to RDF")
     print("=" * 60)
 
     # Load mapped data
-    if not MAPPED_DATA.exists():
-        print(f"Error: {MAPPED_DATA} not found. Run step 3 first.")
-        return None
-
-    with open(MAPPED_DATA) as f:
-        data = json.load(f)
+    if data is None:
+        if not MAPPED_DATA.exists():
+            print(f"Error: {MAPPED_DATA} not found. Run step 3 first.")
+            return None
+
+        with open(MAPPED_DATA, 'rb') as f:
+            data = orjson.loads(f.read())
+
+    for table_file in (ENTITIES_TABLE, RELATIONSHIPS_TABLE):
+        if not table_file.exists():
+            print(f"Error: {table_file} not found. Run step 1 first.")
+            return None
+
+    data = {
+        **data,
+        "entities": feather.read_table(ENTITIES_TABLE),
+        "relationships": feather.read_table(RELATIONSHIPS_TABLE),
+    }
 
     print(
-        f"Loaded {len(data['entities'])} entities and {len(data['relationships'])} relationships")
+        f"Loaded {data['entities'].num_rows} entities and {data['relationships'].num_rows} relationships")
 
     # Convert to RDF
-    graph = convert_to_rdf(data)
+    statements = convert_to_rdf(data)
 
     # Serialize
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     print(f"\nSerializing to: {FINAL_RDF}")
-    graph.serialize(destination=str(FINAL_RDF), format="turtle")
+    preview = write_turtle(statements, FINAL_RDF)
 
-    print(f"  Total triples: {len(graph)}")
+    print(f"  Total triples: {len(statements)}")
     print(f"\n✓ Saved to: {FINAL_RDF}")
 
     # Show sample
     print("\n" + "-" * 60)
     print("Sample output (first 30 lines):")
-    with open(FINAL_RDF) as f:
-        for i, line in enumerate(f):
-            if i >= 30:
-                print("...")
-                break
-            print(line.rstrip())
-
-    return graph
+    for line in preview[:30]:
+        print(line.rstrip())
+    if len(preview) > 30:
+        print("...")
+
+    return statements
 
 
 if __name__ == "__main__":